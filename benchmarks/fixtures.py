@@ -0,0 +1,173 @@
+"""
+Synthetic fixtures for the benchmarks: a fake slurm on PATH, submitit style
+log directories and source trees for snapshot.
+"""
+from pathlib import Path
+import os
+import shlex
+import stat
+
+
+SQUEUE_HEADER = "JOBID|ARRAY_JOB_ID|ARRAY_TASK_ID|PARTITION|NAME|STATE|TIME|NODES|NODELIST|STDOUT|STDERR"
+SACCT_HEADER = "JobID|JobName|Partition|Account|AllocCPUS|ReqMem|AllocTRES|State|ExitCode"
+STATES = ["RUNNING", "RUNNING", "RUNNING", "PENDING", "COMPLETING"]
+# Final lines submitit writes, these drive Job.state in the dashboard
+LOG_ENDINGS = [
+    "Job completed successfully",
+    "Submitted job triggered an exception",
+    "Job has timed out",
+    "",
+]
+FILLER_LINE = "INFO step={step} loss=0.{step:06d} lr=0.0001 throughput=1234.5 samples/s\n"
+
+
+def squeue_row(idx: int, log_dir: str = "/checkpoint/logs"):
+    """
+    Produces one squeue row in the SQUEUE format, cycling between array jobs,
+    multi-node jobs and plain jobs so that every stdout/stderr branch is parsed.
+    """
+    state = STATES[idx % len(STATES)]
+    base_id = str(1_000_000 + idx)
+    kind = idx % 3
+    if kind == 0:
+        task_id = str(idx % 16)
+        job_id = f"{base_id}_{task_id}"
+        num_nodes = "1"
+        stdout = f"{log_dir}/%A_%a_log.out"
+        stderr = f"{log_dir}/%A_%a_log.err"
+    elif kind == 1:
+        task_id = "N/A"
+        job_id = base_id
+        num_nodes = "4"
+        stdout = f"{log_dir}/%j_%n_log.out"
+        stderr = f"{log_dir}/%j_%n_log.err"
+    else:
+        task_id = "N/A"
+        job_id = base_id
+        num_nodes = "1"
+        stdout = f"{log_dir}/%j_log.out"
+        stderr = f"{log_dir}/%j_log.err"
+    nodelist = f"node[{idx % 100:03d}-{idx % 100 + int(num_nodes) - 1:03d}]"
+    return "|".join(
+        [
+            job_id,
+            base_id,
+            task_id,
+            "learnlab",
+            f"experiment_{idx}",
+            state,
+            f"{idx % 24}:{idx % 60:02d}:00",
+            num_nodes,
+            nodelist,
+            stdout,
+            stderr,
+        ]
+    )
+
+
+def sacct_row(idx: int):
+    return f"{1_000_000 + idx}|experiment_{idx}|learnlab|research|10|64G|cpu=10,gres/gpu=1|RUNNING|0:0"
+
+
+def _write_executable(path: Path, content: str):
+    path.write_text(content)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def make_fake_slurm(bin_dir: Path, num_jobs: int):
+    """
+    Writes fake `squeue` and `sacct` executables into bin_dir that ignore their
+    arguments and print num_jobs rows. The output is pre-rendered so the fake
+    commands cost no more than a `cat`, leaving parsing as the measured work.
+    Prepend bin_dir to PATH to use them.
+    """
+    bin_dir = Path(bin_dir)
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    squeue_out = bin_dir / "squeue.txt"
+    squeue_out.write_text(
+        "\n".join([SQUEUE_HEADER] + [squeue_row(i) for i in range(num_jobs)]) + "\n"
+    )
+    sacct_out = bin_dir / "sacct.txt"
+    sacct_out.write_text(
+        "\n".join([SACCT_HEADER] + [sacct_row(i) for i in range(num_jobs)]) + "\n"
+    )
+    _write_executable(
+        bin_dir / "squeue", f"#!/bin/sh\nexec cat {shlex.quote(str(squeue_out))}\n"
+    )
+    _write_executable(
+        bin_dir / "sacct", f"#!/bin/sh\nexec cat {shlex.quote(str(sacct_out))}\n"
+    )
+    return bin_dir
+
+
+def _log_content(size: int, ending: str):
+    lines = []
+    total = 0
+    step = 0
+    while total < size:
+        line = FILLER_LINE.format(step=step)
+        lines.append(line)
+        total += len(line)
+        step += 1
+    if ending != "":
+        lines.append(ending + "\n")
+    return "".join(lines)
+
+
+def make_submitit_logs(
+    log_dir: Path, num_jobs: int, tasks_per_job: int = 1, file_size: int = 4096
+):
+    """
+    Writes a submitit style log directory with, for each job, a
+    `{job_id}_submission.sh` and `{job_id}_{task_id}_log.out/err` per task.
+    Log files are roughly file_size bytes and end with the marker lines the
+    dashboard uses to infer job state. Returns the number of log files written.
+    """
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    contents = [_log_content(file_size, ending) for ending in LOG_ENDINGS]
+    num_files = 0
+    for idx in range(num_jobs):
+        job_id = 1_000_000 + idx
+        (log_dir / f"{job_id}_submission.sh").write_text(
+            f"#!/bin/bash\n#SBATCH --output={log_dir}/%A_%a_log.out\n"
+        )
+        for task_id in range(tasks_per_job):
+            content = contents[(idx + task_id) % len(contents)]
+            (log_dir / f"{job_id}_{task_id}_log.out").write_text(content)
+            (log_dir / f"{job_id}_{task_id}_log.err").write_text(content)
+            num_files += 2
+    return num_files
+
+
+def make_source_tree(
+    root: Path, num_files: int, file_size: int = 8192, files_per_dir: int = 20
+):
+    """
+    Writes a source tree of num_files files of file_size bytes, nested so that
+    each directory holds at most files_per_dir files. Returns the total bytes written.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    content = ("x = 1  # synthetic source line\n" * (file_size // 31 + 1))[:file_size]
+    total = 0
+    for idx in range(num_files):
+        parts = []
+        dir_idx = idx // files_per_dir
+        while dir_idx > 0:
+            parts.append(f"pkg_{dir_idx % files_per_dir}")
+            dir_idx //= files_per_dir
+        directory = root.joinpath(*reversed(parts))
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"module_{idx}.py").write_text(content)
+        total += file_size
+    return total
+
+
+def prepend_path(bin_dir: Path, env: dict = None):
+    """
+    Returns a copy of env (default: os.environ) with bin_dir first on PATH.
+    """
+    env = dict(os.environ if env is None else env)
+    env["PATH"] = f"{bin_dir}{os.pathsep}{env.get('PATH', '')}"
+    return env
@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+"""
+Benchmarks for stui, slogs, snapshot and the dashboard against synthetic fixtures.
+
+Run from the repository root:
+$ python -m benchmarks.run run --output bench_results.json
+$ python -m benchmarks.run compare old_results.json bench_results.json
+"""
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks import fixtures
+from slurm_tools import profiling
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+console = Console()
+cli = typer.Typer()
+
+
+@dataclass
+class BenchParams:
+    repeats: int
+    squeue_jobs: int
+    log_jobs: int
+    tasks_per_job: int
+    log_size: int
+    source_files: int
+    source_file_size: int
+
+
+def summarize(times: List[float]):
+    return {
+        "repeats": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "max": max(times),
+    }
+
+
+def timeit(fn, repeats: int):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return summarize(times)
+
+
+@contextmanager
+def patched_environ(env: dict):
+    original = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(original)
+
+
+@contextmanager
+def working_directory(path: Path):
+    original = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(original)
+
+
+def bench_squeue_parse(workdir: Path, params: BenchParams):
+    from slurm_tools.slurm_tui import parse_squeue
+
+    bin_dir = fixtures.make_fake_slurm(workdir / "bin", params.squeue_jobs)
+    # Split the same way run_squeue does, so only parsing is timed
+    lines = (bin_dir / "squeue.txt").read_text().strip().split("\n")
+    result = timeit(lambda: parse_squeue(lines), params.repeats)
+    result["jobs"] = params.squeue_jobs
+    return result
+
+
+def bench_squeue_end_to_end(workdir: Path, params: BenchParams):
+    from slurm_tools.slurm_tui import run_squeue
+
+    bin_dir = fixtures.make_fake_slurm(workdir / "bin", params.squeue_jobs)
+    env = fixtures.prepend_path(bin_dir)
+    env.pop("STUI_CACHE", None)
+    with patched_environ(env):
+        result = timeit(lambda: asyncio.run(run_squeue()), params.repeats)
+    result["jobs"] = params.squeue_jobs
+    return result
+
+
+async def _time_tui_refresh(repeats: int):
+    from slurm_tools.slurm_tui import SlurmDashboardApp
+
+    async def wait_for_table(pilot):
+        while not app.query_one("#loading").has_class("hidden"):
+            await pilot.pause()
+
+    app = SlurmDashboardApp()
+    async with app.run_test() as pilot:
+        start = time.perf_counter()
+        await wait_for_table(pilot)
+        mount_time = time.perf_counter() - start
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            await pilot.press("r")
+            await wait_for_table(pilot)
+            times.append(time.perf_counter() - start)
+    return mount_time, times
+
+
+def bench_tui_refresh(workdir: Path, params: BenchParams):
+    bin_dir = fixtures.make_fake_slurm(workdir / "bin", params.squeue_jobs)
+    env = fixtures.prepend_path(bin_dir)
+    env.pop("STUI_CACHE", None)
+    with patched_environ(env):
+        mount_time, times = asyncio.run(_time_tui_refresh(params.repeats))
+    result = summarize(times)
+    result["jobs"] = params.squeue_jobs
+    result["first_load"] = mount_time
+    return result
+
+
+def _import_dashboard(log_dir: Path):
+    # dashboard.py is a streamlit script that renders on import, outside of
+    # `streamlit run` this is a no-op besides some warnings
+    env = dict(os.environ, SLURM_DASHBOARD_DIR=str(log_dir))
+    spec = importlib.util.spec_from_file_location("dashboard", REPO_ROOT / "dashboard.py")
+    module = importlib.util.module_from_spec(spec)
+    with patched_environ(env), redirect_stderr(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def bench_dashboard_load(workdir: Path, params: BenchParams):
+    log_dir = workdir / "logs"
+    num_files = fixtures.make_submitit_logs(
+        log_dir, params.log_jobs, params.tasks_per_job, params.log_size
+    )
+    dashboard = _import_dashboard(log_dir)
+
+    def load_sidebar():
+        # Mirrors the sidebar, which renders every job's modified time and state
+        jobs = dashboard.load_job_logs()
+        for job in jobs.values():
+            job.modified
+            job.state
+
+    result = timeit(load_sidebar, params.repeats)
+    result["files"] = num_files
+    return result
+
+
+def bench_slogs_discovery(workdir: Path, params: BenchParams):
+    from slurm_tools.slurm_logs import find_slurm_jobs
+
+    log_dir = workdir / "logs"
+    num_files = fixtures.make_submitit_logs(
+        log_dir, params.log_jobs, params.tasks_per_job, params.log_size
+    )
+    result = timeit(lambda: find_slurm_jobs(str(log_dir)), params.repeats)
+    result["files"] = num_files
+    return result
+
+
+def entry_point_command(module: str, args: List[str]):
+    """
+    Runs a tool the way its installed console script does, rather than with
+    `python -m` which imports runpy and friends on top
+    """
+    code = f"import sys; from {module} import cli; sys.exit(cli())"
+    return [sys.executable, "-c", code, *args]
+
+
+def entry_point_env(bin_dir: Path):
+    env = fixtures.prepend_path(bin_dir)
+    env["PYTHONPATH"] = f"{REPO_ROOT}{os.pathsep}{env.get('PYTHONPATH', '')}"
+    env.pop(profiling.PROFILE_ENV, None)
+    return env
+
+
+def slogs_startup_fixture(workdir: Path, params: BenchParams):
+    log_dir = workdir / "logs"
+    fixtures.make_submitit_logs(
+        log_dir, params.log_jobs, params.tasks_per_job, params.log_size
+    )
+    bin_dir = fixtures.make_fake_slurm(workdir / "bin", params.squeue_jobs)
+    return [str(log_dir)], entry_point_env(bin_dir)
+
+
+def snapshot_startup_fixture(workdir: Path, params: BenchParams):
+    # A dry run skips the copy, leaving the cost of starting up
+    return ["--dry-run", "--base-dir", str(workdir / "snapshots"), "true"], entry_point_env(workdir)
+
+
+def time_entry_point(module: str, args: List[str], env: dict, cwd: Path, repeats: int):
+    command = entry_point_command(module, args)
+    return timeit(
+        lambda: subprocess.run(
+            command, env=env, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ),
+        repeats,
+    )
+
+
+def bench_slogs_cli(workdir: Path, params: BenchParams):
+    args, env = slogs_startup_fixture(workdir, params)
+    return time_entry_point("slurm_tools.slurm_logs", args, env, workdir, params.repeats)
+
+
+def bench_snapshot_startup(workdir: Path, params: BenchParams):
+    args, env = snapshot_startup_fixture(workdir, params)
+    return time_entry_point("slurm_tools.snapshot", args, env, workdir, params.repeats)
+
+
+def bench_snapshot_copy(workdir: Path, params: BenchParams):
+    from slurm_tools import snapshot
+
+    source_dir = workdir / "source"
+    total_bytes = fixtures.make_source_tree(
+        source_dir, params.source_files, params.source_file_size
+    )
+    base_dir = workdir / "snapshots"
+    experiment_ids = iter(range(params.repeats))
+
+    def copy():
+        with working_directory(source_dir), redirect_stdout(io.StringIO()):
+            snapshot.main(
+                "true", base_dir=str(base_dir), experiment_id=str(next(experiment_ids))
+            )
+
+    result = timeit(copy, params.repeats)
+    result["files"] = params.source_files
+    result["bytes"] = total_bytes
+    result["mb_per_second"] = total_bytes / result["median"] / 1e6
+    return result
+
+
+BENCHMARKS = {
+    "squeue_parse": bench_squeue_parse,
+    "squeue_end_to_end": bench_squeue_end_to_end,
+    "tui_refresh": bench_tui_refresh,
+    "dashboard_load": bench_dashboard_load,
+    "slogs_discovery": bench_slogs_discovery,
+    "slogs_cli": bench_slogs_cli,
+    "snapshot_copy": bench_snapshot_copy,
+    "snapshot_startup": bench_snapshot_startup,
+}
+
+STARTUP_CHECKS = {
+    "slurm_tools.snapshot": snapshot_startup_fixture,
+    "slurm_tools.slurm_logs": slogs_startup_fixture,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@cli.command()
+def run(
+    output: str = "bench_results.json",
+    only: List[str] = typer.Option(None, help=f"Benchmarks to run: {', '.join(BENCHMARKS)}"),
+    repeats: int = 5,
+    squeue_jobs: int = 2_000,
+    log_jobs: int = 1_000,
+    tasks_per_job: int = 1,
+    log_size: int = 16_384,
+    source_files: int = 2_000,
+    source_file_size: int = 8_192,
+    workdir: Optional[str] = typer.Option(
+        None, help="Where to write fixtures, defaults to a temporary directory"
+    ),
+):
+    """
+    Runs the benchmarks and writes the timings, in seconds, to a JSON file.
+    """
+    params = BenchParams(
+        repeats=repeats,
+        squeue_jobs=squeue_jobs,
+        log_jobs=log_jobs,
+        tasks_per_job=tasks_per_job,
+        log_size=log_size,
+        source_files=source_files,
+        source_file_size=source_file_size,
+    )
+    names = only if only else list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise typer.BadParameter(f"Unknown benchmark: {name}")
+
+    results = {}
+    for name in names:
+        console.log(f"Running {name}")
+        with tempfile.TemporaryDirectory(prefix=f"bench_{name}_", dir=workdir) as tmp:
+            results[name] = BENCHMARKS[name](Path(tmp), params)
+        console.log(f"{name}: median {results[name]['median'] * 1000:.2f} ms")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": asdict(params),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    console.log(f"Wrote results to {output}")
+
+
+@cli.command()
+def check_startup(budget_ms: float = 50.0, repeats: int = 10):
+    """
+    Checks that the median warm startup of snapshot and slogs is within budget_ms.
+    Startup time depends on the host as much as the code, so this is a benchmark
+    to run on a known machine, the import check lives in tests/test_startup.py.
+    """
+    params = BenchParams(
+        repeats=repeats,
+        squeue_jobs=10,
+        log_jobs=10,
+        tasks_per_job=1,
+        log_size=1024,
+        source_files=0,
+        source_file_size=0,
+    )
+    failures = []
+    for module, make_fixture in STARTUP_CHECKS.items():
+        with tempfile.TemporaryDirectory(prefix="bench_startup_") as tmp:
+            args, env = make_fixture(Path(tmp), params)
+            # The first run warms the filesystem and bytecode caches
+            time_entry_point(module, args, env, Path(tmp), 1)
+            median_ms = time_entry_point(module, args, env, Path(tmp), repeats)["median"] * 1000
+        console.log(f"{module}: median startup {median_ms:.1f} ms, budget {budget_ms:.1f} ms")
+        if median_ms > budget_ms:
+            failures.append(f"{module} took {median_ms:.1f} ms, over the {budget_ms:.1f} ms budget")
+
+    if failures:
+        for failure in failures:
+            console.print(f"[red]{failure}[/red]")
+        raise typer.Exit(code=1)
+
+
+@cli.command()
+def compare(baseline: str, current: str, threshold: float = 1.1):
+    """
+    Compares median timings of two result files, flagging benchmarks that are
+    slower than baseline by more than threshold.
+    """
+    with open(baseline) as f:
+        old = json.load(f)
+    with open(current) as f:
+        new = json.load(f)
+    if old["params"] != new["params"]:
+        console.print("[yellow]Warning: benchmark parameters differ between runs[/yellow]")
+
+    table = Table(title=f"{old['commit']} -> {new['commit']}")
+    table.add_column("Benchmark")
+    table.add_column("Baseline (ms)", justify="right")
+    table.add_column("Current (ms)", justify="right")
+    table.add_column("Ratio", justify="right")
+    regressions = []
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            continue
+        old_median = old["results"][name]["median"]
+        new_median = result["median"]
+        ratio = new_median / old_median
+        if ratio > threshold:
+            regressions.append(name)
+            style = "red"
+        elif ratio < 1 / threshold:
+            style = "green"
+        else:
+            style = ""
+        table.add_row(
+            name,
+            f"{old_median * 1000:.2f}",
+            f"{new_median * 1000:.2f}",
+            f"[{style}]{ratio:.2f}x[/{style}]" if style else f"{ratio:.2f}x",
+        )
+    console.print(table)
+    if regressions:
+        console.print(f"[red]Regressions: {', '.join(regressions)}[/red]")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    cli()
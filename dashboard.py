@@ -4,11 +4,14 @@ import streamlit as st
 from datetime import datetime
 import os
 import re
-import subprocess
 from pydantic import BaseModel
 from pathlib import Path
-import glob
 
+from slurm_tools import profiling
+
+# Streamlit reruns this script on every interaction for every session, so the events are only
+# kept for this run's timings expander rather than accumulated in the trace written at exit
+profile_events = profiling.start_collecting(trace=False)
 st.set_page_config(layout="wide")
 st.markdown(
     """
@@ -30,7 +33,7 @@ SLURM_LOG_DIR = os.environ.get("SLURM_DASHBOARD_DIR", "")
 # NOTE: This needs to be something manually called, e.g. a button
 # to avoid trouble with calling this too much
 def squeue():
-    output = subprocess.run(
+    output = profiling.run(
         f'squeue --me --Format "JobId:|,Partition:|,Name:|,State:|,TimeUsed:|,NumNodes:|,Nodelist:|,tres-per-node:|,UserName"',
         check=True,
         shell=True,
@@ -49,7 +52,7 @@ def squeue():
 
 def slurm_job_info(job_id):
     job_id = job_id.replace("_0", "")
-    output = subprocess.run(
+    output = profiling.run(
         f"sacct -j {job_id} --format 'JobID,JobName,Partition,Account,AllocCPUS,ReqMem,AllocTRES,State,ExitCode'", check=True, shell=True, capture_output=True, text=True
     )
     return output.stdout
@@ -73,21 +76,22 @@ class Job(BaseModel):
     @property
     def modified(self):
         return datetime.fromtimestamp(
-            max(self.out_path.stat().st_mtime, self.err_path.stat().st_mtime)
+            max(
+                profiling.stat(self.out_path).st_mtime,
+                profiling.stat(self.err_path).st_mtime,
+            )
         )
 
     @property
     def out(self):
         if self.cache_out is None:
-            with open(self.out_path) as f:
-                self.cache_out = f.read()
+            self.cache_out = profiling.read_text(self.out_path)
         return self.cache_out
 
     @property
     def err(self):
         if self.cache_err is None:
-            with open(self.err_path) as f:
-                self.cache_err = f.read()
+            self.cache_err = profiling.read_text(self.err_path)
         return self.cache_err
 
     @property
@@ -106,12 +110,12 @@ class Job(BaseModel):
 
 def load_job_logs():
     jobs = {}
-    for p in glob.glob(f"{SLURM_LOG_DIR}/*_log.out"):
+    for p in profiling.glob(f"{SLURM_LOG_DIR}/*_log.out"):
         filename = Path(p).name
         job_id = re.match("(.*)_log\.out", filename).group(1)
         if job_id not in jobs:
             jobs[job_id] = Job(job_id=job_id)
-    for p in glob.glob(f"{SLURM_LOG_DIR}/*_log.err"):
+    for p in profiling.glob(f"{SLURM_LOG_DIR}/*_log.err"):
         filename = Path(p).name
         job_id = re.match("(.*)_log\.err", filename).group(1)
         if job_id not in jobs:
@@ -136,7 +140,7 @@ if isinstance(squeue_out, str):
 else:
     st.table(squeue_out)
 current_job_id = None
-with st.sidebar:
+with st.sidebar, profiling.span("render", "sidebar", jobs=len(slurm_jobs)):
     st.header("Slurm Jobs")
     job_prefix_filter = st.text_input("Job ID Prefix Filter")
     if len(slurm_jobs) == 0:
@@ -176,8 +180,13 @@ else:
     if current_job.info is not None:
         st.code(job_info)
 
-    out, err = st.tabs(["Standard Out", "Standard Error"])
-    out.subheader("Standard Out")
-    out.code(current_job.out)
-    err.subheader("Standard Err")
-    err.code(current_job.err)
+    with profiling.span("render", "logs"):
+        out, err = st.tabs(["Standard Out", "Standard Error"])
+        out.subheader("Standard Out")
+        out.code(current_job.out)
+        err.subheader("Standard Err")
+        err.code(current_job.err)
+
+if profiling.is_enabled():
+    with st.expander("Timings"):
+        st.markdown(profiling.breakdown_markdown(profile_events))
@@ -0,0 +1,128 @@
+"""
+Plain sys.argv parsing for the fast startup path of snapshot and slogs.
+
+typer, and click and rich with it, can take hundreds of milliseconds to import
+on cold nodes with Python on NFS, so the common invocations are parsed here
+without them. Anything this parser does not understand, including --help,
+returns None and the caller falls back to the typer CLI for the usual help and
+error messages.
+"""
+
+
+def parse_argv(argv, positional, options=None, flags=(), multiple=()):
+    """
+    Parses argv the way typer would for a command with:
+    - positional: names of the required positional arguments, in order
+    - options: mapping of option name (e.g., "base_dir" for --base-dir) to a conversion function
+    - flags: names of boolean options, accepted as --name and --no-name
+    - multiple: option names that may be repeated, collected into a list
+
+    Returns a dict of parsed values, or None if the arguments should be handled by typer.
+    """
+    if options is None:
+        options = {}
+    values = {}
+    positionals = []
+    only_positional = False
+    idx = 0
+    while idx < len(argv):
+        arg = argv[idx]
+        idx += 1
+        if only_positional or arg == "-" or not arg.startswith("-"):
+            positionals.append(arg)
+            continue
+        if arg == "--":
+            only_positional = True
+            continue
+        if not arg.startswith("--"):
+            return None
+        name, has_value, value = arg[2:].partition("=")
+        name = name.replace("-", "_")
+        if name in flags and not has_value:
+            values[name] = True
+        elif name.startswith("no_") and name[3:] in flags and not has_value:
+            values[name[3:]] = False
+        elif name in options:
+            if not has_value:
+                if idx == len(argv):
+                    return None
+                value = argv[idx]
+                idx += 1
+            try:
+                value = options[name](value)
+            except ValueError:
+                return None
+            if name in multiple:
+                values.setdefault(name, []).append(value)
+            else:
+                values[name] = value
+        else:
+            return None
+
+    if len(positionals) != len(positional):
+        return None
+    values.update(zip(positional, positionals))
+    return values
+
+
+def parse_argv_for(func, argv):
+    """
+    Parses argv for func, deriving the parse_argv spec from its signature the way typer would:
+    parameters without defaults are positional, bool parameters are flags, "List[str]"
+    parameters are repeatable options and str or int parameters are options. Parameters with
+    any other annotation are left to typer. Uses the code object rather than inspect to keep
+    startup fast, and string annotations so that modules need not import typing.
+    """
+    code = func.__code__
+    names = code.co_varnames[: code.co_argcount]
+    defaults = func.__defaults__ or ()
+    num_positional = len(names) - len(defaults)
+    options = {}
+    flags = []
+    multiple = []
+    for name in names[num_positional:]:
+        annotation = func.__annotations__.get(name, str)
+        if annotation is bool:
+            flags.append(name)
+        elif annotation == "List[str]":
+            options[name] = str
+            multiple.append(name)
+        elif annotation in (str, int):
+            options[name] = annotation
+    return parse_argv(
+        argv,
+        positional=list(names[:num_positional]),
+        options=options,
+        flags=flags,
+        multiple=multiple,
+    )
+
+
+def typer_command(func, annotations=None, defaults=None):
+    """
+    Returns a wrapper of func for typer with some parameter annotations and defaults
+    replaced, e.g., to resolve "List[str]" or show a default computed from the environment
+    in --help, without changing func itself
+    """
+    import functools
+    import inspect
+
+    annotations = annotations or {}
+    defaults = defaults or {}
+    signature = inspect.signature(func)
+    parameters = [
+        p.replace(
+            annotation=annotations.get(p.name, p.annotation),
+            default=defaults.get(p.name, p.default),
+        )
+        for p in signature.parameters.values()
+    ]
+
+    @functools.wraps(func)
+    def command(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    command.__signature__ = signature.replace(parameters=parameters)
+    # functools.wraps shares func's annotations dict, so replace rather than update it
+    command.__annotations__ = {**func.__annotations__, **annotations}
+    return command
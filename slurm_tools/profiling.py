@@ -0,0 +1,335 @@
+"""
+Lightweight timing instrumentation shared by stui, slogs, snapshot and the dashboard.
+
+Profiling is off by default and turned on either by passing --profile to a tool
+or by setting SLURM_TOOLS_PROFILE=1. When on, every subprocess call, file stat,
+file read (with bytes), parse and render step is recorded and at exit a summary table is
+printed to stderr and a Chrome trace-event file is written to
+SLURM_TOOLS_PROFILE_TRACE (default: slurm_tools_trace.json), which can be
+opened in chrome://tracing or https://ui.perfetto.dev.
+
+Render spans time the calls that update widgets, e.g., DataTable.add_row in stui or
+st.code in the dashboard, not the painting that Textual or the browser do afterwards.
+
+When off, span() returns a shared no-op context manager so the cost is a
+function call and a global lookup. snapshot and slogs import this module on
+their fast startup path, so only modules they already need are imported eagerly.
+"""
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import atexit
+import io
+import os
+import subprocess
+import threading
+import time
+
+
+PROFILE_ENV = "SLURM_TOOLS_PROFILE"
+TRACE_ENV = "SLURM_TOOLS_PROFILE_TRACE"
+DEFAULT_TRACE_PATH = "slurm_tools_trace.json"
+# The trace keeps the most recent events so long running tools like stui use bounded memory
+MAX_TRACE_EVENTS = 100_000
+
+_ORIGIN = time.perf_counter()
+_enabled = False
+_trace_path = None
+_events = deque(maxlen=MAX_TRACE_EVENTS)
+# (events, trace) of the step being collected in this context (thread or asyncio task), see collect()
+_collector = ContextVar("slurm_tools_profiling_collector", default=None)
+
+Event = namedtuple("Event", ["category", "name", "start", "duration", "thread_id", "args"])
+
+
+class _Span:
+    __slots__ = ("category", "name", "args", "start")
+
+    def __init__(self, category: str, name: str, args: dict):
+        self.category = category
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def set(self, **kwargs):
+        self.args.update(kwargs)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        event = Event(
+            self.category,
+            self.name,
+            self.start - _ORIGIN,
+            end - self.start,
+            threading.get_ident(),
+            self.args,
+        )
+        collector = _collector.get()
+        if collector is None:
+            _events.append(event)
+        else:
+            events, trace = collector
+            events.append(event)
+            if trace:
+                _events.append(event)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(trace_path: str = None):
+    """
+    Turns on recording and registers the summary/trace dump at exit.
+    The trace path is resolved now since tools like snapshot change directory.
+    """
+    global _enabled, _trace_path
+    if trace_path is None:
+        trace_path = os.environ.get(TRACE_ENV, DEFAULT_TRACE_PATH)
+    _trace_path = os.path.abspath(trace_path)
+    if not _enabled:
+        _enabled = True
+        atexit.register(dump)
+
+
+def reset():
+    _events.clear()
+
+
+def span(category: str, name: str, **args):
+    if not _enabled:
+        return NULL_SPAN
+    return _Span(category, name, args)
+
+
+def run(command, **kwargs):
+    """
+    subprocess.run, recorded as a subprocess span
+    """
+    with span("subprocess", str(command)):
+        return subprocess.run(command, **kwargs)
+
+
+def stat(path):
+    with span("stat", str(path)):
+        return os.stat(path)
+
+
+def isfile(path):
+    with span("stat", str(path)):
+        return os.path.isfile(path)
+
+
+def glob(pattern: str):
+    import glob as _glob
+
+    with span("list", pattern) as s:
+        paths = _glob.glob(pattern)
+        s.set(entries=len(paths))
+    return paths
+
+
+def _open_text(path, s):
+    # Reads the raw bytes to record their size, then decodes them the same way open(path) would
+    with open(path, "rb") as f:
+        data = f.read()
+    s.set(bytes=len(data))
+    return io.TextIOWrapper(io.BytesIO(data))
+
+
+def read_text(path):
+    with span("read", str(path)) as s:
+        with _open_text(path, s) as f:
+            return f.read()
+
+
+def readlines(path):
+    with span("read", str(path)) as s:
+        with _open_text(path, s) as f:
+            return f.readlines()
+
+
+def copy2(src, dst, *, follow_symlinks=True):
+    """
+    shutil.copy2, recorded as a copy span, for use as copytree's copy_function
+    """
+    import shutil
+
+    with span("copy", str(src)) as s:
+        result = shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+        s.set(bytes=os.path.getsize(result))
+    return result
+
+
+@contextmanager
+def collect(trace: bool = True):
+    """
+    Collects the events recorded in the current context into the yielded list, e.g.,
+    for one stui refresh. The collector is a context variable, so spans from other
+    asyncio tasks or threads running at the same time are not collected. With
+    trace=False, the events are kept out of the summary and trace written at exit.
+    """
+    events = []
+    token = _collector.set((events, trace))
+    try:
+        yield events
+    finally:
+        _collector.reset(token)
+
+
+def start_collecting(trace: bool = True):
+    """
+    Like collect(), for steps that cannot be wrapped in a with block, e.g., a Streamlit
+    script run. Collection continues in this context until start_collecting is called again.
+    """
+    events = []
+    _collector.set((events, trace))
+    return events
+
+
+def self_times(events: list):
+    """
+    Returns each event's exclusive duration, i.e., minus the time of spans nested
+    in it on the same thread, so that a read inside a render step is not counted twice.
+    Spans interleaved by asyncio on the same thread can overlap without nesting, so a
+    span is only subtracted from the innermost span that fully contains it.
+    """
+    durations = [e.duration for e in events]
+    by_thread = {}
+    for idx, e in enumerate(events):
+        by_thread.setdefault(e.thread_id, []).append(idx)
+    for indices in by_thread.values():
+        indices.sort(key=lambda i: (events[i].start, -events[i].duration))
+        # Spans that have started and not yet ended as (end, index), latest start last
+        open_spans = []
+        for idx in indices:
+            e = events[idx]
+            end = e.start + e.duration
+            while open_spans and open_spans[-1][0] <= e.start:
+                open_spans.pop()
+            for parent_end, parent_idx in reversed(open_spans):
+                if end <= parent_end:
+                    durations[parent_idx] -= e.duration
+                    break
+            open_spans.append((end, idx))
+    # Concurrent children of one span can add up to more than it
+    return [max(d, 0.0) for d in durations]
+
+
+def breakdown(events: list = None):
+    """
+    Aggregates events by category into count, total and max exclusive seconds, and bytes
+    """
+    if events is None:
+        events = list(_events)
+    totals = {}
+    for e, duration in zip(events, self_times(events)):
+        if e.category not in totals:
+            totals[e.category] = {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0}
+        entry = totals[e.category]
+        entry["count"] += 1
+        entry["total"] += duration
+        entry["max"] = max(entry["max"], duration)
+        entry["bytes"] += e.args.get("bytes", 0)
+    return totals
+
+
+def breakdown_markdown(events: list = None):
+    lines = [
+        "| Category | Count | Self Total (ms) | Self Max (ms) | Bytes |",
+        "|---|---:|---:|---:|---:|",
+    ]
+    for category, entry in sorted(
+        breakdown(events).items(), key=lambda kv: kv[1]["total"], reverse=True
+    ):
+        lines.append(
+            f"| {category} | {entry['count']} | {entry['total'] * 1000:.2f}"
+            f" | {entry['max'] * 1000:.2f} | {entry['bytes']} |"
+        )
+    return "\n".join(lines)
+
+
+def summary_table(events: list = None):
+    from rich.table import Table
+
+    table = Table(title="slurm-tools profile")
+    table.add_column("Category")
+    table.add_column("Count", justify="right")
+    table.add_column("Self Total (ms)", justify="right")
+    table.add_column("Self Max (ms)", justify="right")
+    table.add_column("Bytes", justify="right")
+    for category, entry in sorted(
+        breakdown(events).items(), key=lambda kv: kv[1]["total"], reverse=True
+    ):
+        table.add_row(
+            category,
+            str(entry["count"]),
+            f"{entry['total'] * 1000:.2f}",
+            f"{entry['max'] * 1000:.2f}",
+            str(entry["bytes"]),
+        )
+    return table
+
+
+def write_chrome_trace(path: str, events: list = None):
+    import json
+
+    if events is None:
+        events = _events
+    pid = os.getpid()
+    trace = [
+        {
+            "name": e.name,
+            "cat": e.category,
+            "ph": "X",
+            "ts": e.start * 1e6,
+            "dur": e.duration * 1e6,
+            "pid": pid,
+            "tid": e.thread_id,
+            "args": e.args,
+        }
+        for e in events
+    ]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+def dump():
+    """
+    Prints the summary table to stderr and writes the Chrome trace
+    """
+    if not _events:
+        return
+    from rich.console import Console
+
+    write_chrome_trace(_trace_path)
+    console = Console(stderr=True)
+    console.print(summary_table())
+    if len(_events) == MAX_TRACE_EVENTS:
+        console.print(f"Only the last {MAX_TRACE_EVENTS} events were kept")
+    console.print(f"Wrote Chrome trace to {_trace_path}")
+
+
+if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+    enable()
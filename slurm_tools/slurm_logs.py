@@ -1,44 +1,64 @@
-import subprocess
-import glob
-from pathlib import Path
+"""
+slogs only imports typer and rich when the arguments need the full CLI, e.g.,
+for --help or to report a usage error, so that common invocations start quickly.
+"""
+import os
+import sys
 
-import typer
-from rich.console import Console
+from slurm_tools import profiling
+from slurm_tools.argv import parse_argv_for
 
-console = Console()
-cli = typer.Typer()
 
-
-@cli.command()
-def main(log_dir: str, latest: bool = True, tail_stdout: bool = False, tail_stderr: bool = False):
+def find_slurm_jobs(log_dir: str, latest: bool = True):
     slurm_jobs = []
-    for f in glob.glob(f"{log_dir}/*_submission.sh"):
-        job_id = int(Path(f).name.split('_')[0])
+    for f in profiling.glob(f"{log_dir}/*_submission.sh"):
+        job_id = int(os.path.basename(f).split('_')[0])
         slurm_jobs.append(job_id)
-    
-    slurm_jobs = sorted(slurm_jobs, reverse=latest)
+    return sorted(slurm_jobs, reverse=latest)
+
+
+def main(log_dir: str, latest: bool = True, tail_stdout: bool = False, tail_stderr: bool = False, profile: bool = False):
+    if profile:
+        profiling.enable()
+    slurm_jobs = find_slurm_jobs(log_dir, latest=latest)
     recent_job_id = slurm_jobs[0]
     array_id = 0
-    err_log = Path(log_dir) / f"{recent_job_id}_{array_id}_log.err"
-    out_log = Path(log_dir) / f"{recent_job_id}_{array_id}_log.out"
-    console.print(f"Showing Slurm Job ID: {recent_job_id}")
-    console.print(f"STDOUT: {out_log}")
+    err_log = os.path.join(log_dir, f"{recent_job_id}_{array_id}_log.err")
+    out_log = os.path.join(log_dir, f"{recent_job_id}_{array_id}_log.out")
+    print(f"Showing Slurm Job ID: {recent_job_id}")
+    print(f"STDOUT: {out_log}", flush=True)
     if tail_stdout:
-        subprocess.run(f"tail -f {out_log}", shell=True)
+        profiling.run(f"tail -f {out_log}", shell=True)
     else:
-        subprocess.run(f"cat {out_log}", shell=True)
-    console.print()
+        profiling.run(f"cat {out_log}", shell=True)
+    print()
 
-    console.print(f"STDERR: {err_log}")
+    print(f"STDERR: {err_log}", flush=True)
     if tail_stderr:
-        subprocess.run(f"tail -f {err_log}", shell=True)
+        profiling.run(f"tail -f {err_log}", shell=True)
     else:
-        subprocess.run(f"cat {err_log}", shell=True)
-    console.print()
+        profiling.run(f"cat {err_log}", shell=True)
+    print()
+
+    print(f"squeue --job {recent_job_id}", flush=True)
+    profiling.run(f"squeue --job {recent_job_id}", shell=True)
+
 
-    console.print(f"squeue --job {recent_job_id}")
-    subprocess.run(f"squeue --job {recent_job_id}", shell=True)
+def typer_cli():
+    import typer
+
+    app = typer.Typer()
+    app.command()(main)
+    return app
+
+
+def cli():
+    args = parse_argv_for(main, sys.argv[1:])
+    if args is None:
+        typer_cli()()
+    else:
+        main(**args)
 
 
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
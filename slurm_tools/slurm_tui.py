@@ -3,6 +3,7 @@
 from pathlib import Path
 import asyncio
 import os
+import shutil
 
 import typer
 from textual.app import App, ComposeResult
@@ -21,6 +22,8 @@ from textual.widgets import (
     Label,
 )
 
+from slurm_tools import profiling
+
 
 SQUEUE = "squeue --me --Format='JobID:|,ArrayJobID:|,ArrayTaskID:|,Partition:|,Name:|,State:|,TimeUsed:|,NumNodes:|,Nodelist:|,STDOUT:|,STDERR:'"
 FIELDS = [
@@ -59,19 +62,23 @@ async def run_squeue():
         else:
             path = 'slurm_tui_squeue.txt'
             
-        proc = await asyncio.create_subprocess_shell(
-            f"sleep 1;cat {path}",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, _ = await proc.communicate()
-        lines = stdout.decode("utf8").strip().split("\n")
+        command = f"sleep 1;cat {path}"
     else:
+        command = SQUEUE
+    with profiling.span("subprocess", command) as s:
         proc = await asyncio.create_subprocess_shell(
-            SQUEUE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
         )
         stdout, _ = await proc.communicate()
-        lines = stdout.decode("utf8").strip().split("\n")
+        s.set(bytes=len(stdout))
+    with profiling.span("parse", "squeue") as s:
+        table_rows = parse_squeue(stdout.decode("utf8").strip().split("\n"))
+        s.set(rows=len(table_rows))
+    lookup_table = {(r["array_job_id"], r["array_task_id"]): r for r in table_rows}
+    return table_rows, lookup_table
+
+
+def parse_squeue(lines):
     table_rows = []
     for idx, l in enumerate(lines):
         if idx == 0:
@@ -134,13 +141,11 @@ async def run_squeue():
             row["stderr"] = None
 
         table_rows.append(row)
-    lookup_table = {(r["array_job_id"], r["array_task_id"]): r for r in table_rows}
-    return table_rows, lookup_table
+    return table_rows
 
 
 def read_file(path: Path):
-    with open(path) as f:
-        return f.readlines()
+    return profiling.readlines(path)
 
 
 APP_CSS = """
@@ -216,6 +221,18 @@ Screen {
 HelpScreen {
     align: center middle;
 }
+
+#profile_container {
+    height: auto;
+    padding: 1;
+    width: 90;
+    background: $surface;
+    border: thick cyan 80%;
+}
+
+ProfileScreen {
+    align: center middle;
+}
 .no_x_padding {
     padding-right: 0;
     padding-left: 0;
@@ -229,6 +246,7 @@ HELP = """
 - Click on rows of the `squeue` table to see the job's stdout/stderr logs below
 - Press `r` to refresh squeue (this app does not auto-refresh)
 - Press `l` to refresh stdout/err logs
+- Press `d` to show the timing breakdown of the last refreshes (requires `--profile`)
 - Press `q` to quit the app
 """
 
@@ -247,12 +265,43 @@ class HelpScreen(ModalScreen):
             self.app.pop_screen()
 
 
+class ProfileScreen(ModalScreen):
+    def __init__(self, last_refresh: dict):
+        super().__init__()
+        self.last_refresh = last_refresh
+
+    def compose(self) -> ComposeResult:
+        if not profiling.is_enabled():
+            content = f"Profiling is disabled, run with `--profile` or set `{profiling.PROFILE_ENV}=1`"
+        elif len(self.last_refresh) == 0:
+            content = "Nothing has been refreshed yet"
+        else:
+            sections = []
+            for title, events in self.last_refresh.items():
+                sections.append(f"**{title}**\n\n{profiling.breakdown_markdown(events)}")
+            sections.append(
+                "Render times the widget updates (e.g., `add_row`, `write`), not Textual's painting"
+            )
+            content = "\n\n".join(sections)
+        yield Vertical(
+            Label("Last Refresh Timings"),
+            Markdown(content),
+            Button("Exit", id="exit_profile"),
+            id="profile_container",
+        )
+
+    def on_button_pressed(self, event: Button.Pressed):
+        if event.button.id == "exit_profile":
+            self.app.pop_screen()
+
+
 class SlurmDashboardApp(App):
     TITLE = "Slurm squeue and Log Viewer"
     BINDINGS = [
         ("r", "refresh_slurm", "Refresh Slurm"),
         ("l", "refresh_logs", "Refresh Logs"),
         ("h", "help", "Help"),
+        ("d", "profile", "Timings"),
         ("q", "quit", "Quit"),
     ]
     CSS = APP_CSS
@@ -260,18 +309,24 @@ class SlurmDashboardApp(App):
     def action_help(self) -> None:
         self.push_screen(HelpScreen())
 
+    def action_profile(self) -> None:
+        self.push_screen(ProfileScreen(self.last_refresh))
+
     def action_refresh_logs(self) -> None:
         self._update_log_outputs()
 
     async def _update_slurm(self):
-        self.squeue_rows, self.squeue_lookup = await run_squeue()
-        table = self.query_one(DataTable)
-        table.clear()
-        for (job_id, task_id), row in self.squeue_lookup.items():
-            cells = [row[f] for f in DISPLAY_FIELDS]
-            table.add_row(*cells, key=f"{job_id}_{task_id}")
-        self.query_one("#loading").add_class("hidden")
-        self.query_one("#queue_table").remove_class("hidden")
+        with profiling.collect() as events:
+            self.squeue_rows, self.squeue_lookup = await run_squeue()
+            with profiling.span("render", "queue_table", rows=len(self.squeue_rows)):
+                table = self.query_one(DataTable)
+                table.clear()
+                for (job_id, task_id), row in self.squeue_lookup.items():
+                    cells = [row[f] for f in DISPLAY_FIELDS]
+                    table.add_row(*cells, key=f"{job_id}_{task_id}")
+                self.query_one("#loading").add_class("hidden")
+                self.query_one("#queue_table").remove_class("hidden")
+        self.last_refresh["squeue"] = events
 
     async def on_mount(self) -> None:
         table = self.query_one(DataTable)
@@ -280,14 +335,15 @@ class SlurmDashboardApp(App):
         self.selected_node = 0
         self.num_nodes = 1
         self.entry = None
+        self.last_refresh = {}
         self.query_one("#loading").remove_class("hidden")
         self.query_one("#queue_table").add_class("hidden")
         self.run_worker(self._update_slurm(), exclusive=True)
         self.query_one("#stdout").write(
-            "No Log File Selected", width=os.get_terminal_size().columns - 2
+            "No Log File Selected", width=shutil.get_terminal_size().columns - 2
         )
         self.query_one("#stderr").write(
-            "No Log File Selected", width=os.get_terminal_size().columns - 2
+            "No Log File Selected", width=shutil.get_terminal_size().columns - 2
         )
         self.query_one("#stdout_filename").update("No Job Selected")
         self.query_one("#stderr_filename").update("No Job Selected")
@@ -295,6 +351,11 @@ class SlurmDashboardApp(App):
     def _update_log_outputs(self):
         if self.entry is None:
             return
+        with profiling.collect() as events:
+            self._write_log_outputs()
+        self.last_refresh["logs"] = events
+
+    def _write_log_outputs(self):
         if self.entry["stdout"] is None:
             self.query_one("#stdout").clear()
             self.query_one("#stdout").write(
@@ -305,11 +366,13 @@ class SlurmDashboardApp(App):
             self.query_one("#stdout").clear()
             self.query_one("#stdout_filename").update(f"STDOUT Log File: {stdout_file}")
 
-            if os.path.exists(stdout_file) and os.path.isfile(stdout_file):
-                for line in read_file(stdout_file):
-                    self.query_one("#stdout").write(
-                        line.strip(),
-                    )
+            if profiling.isfile(stdout_file):
+                lines = read_file(stdout_file)
+                with profiling.span("render", "stdout", lines=len(lines)):
+                    for line in lines:
+                        self.query_one("#stdout").write(
+                            line.strip(),
+                        )
             else:
                 self.query_one("#stdout").write(
                     f"Path does not exist: {stdout_file}, is it configured with slurm via --output?"
@@ -324,11 +387,13 @@ class SlurmDashboardApp(App):
             self.query_one("#stderr").clear()
             stderr_file = self.entry["stderr"][self.selected_node]
             self.query_one("#stderr_filename").update(f"STDERR Log File: {stderr_file}")
-            if os.path.exists(stderr_file) and os.path.isfile(stderr_file):
-                for line in read_file(stderr_file):
-                    self.query_one("#stderr").write(
-                        line.strip(),
-                    )
+            if profiling.isfile(stderr_file):
+                lines = read_file(stderr_file)
+                with profiling.span("render", "stderr", lines=len(lines)):
+                    for line in lines:
+                        self.query_one("#stderr").write(
+                            line.strip(),
+                        )
             else:
                 self.query_one("#stderr").write(
                     f"Path does not exist: {stderr_file}, is it configured with slurm via --error?"
@@ -399,7 +464,9 @@ class SlurmDashboardApp(App):
 
 
 @cli.command()
-def main():
+def main(profile: bool = False):
+    if profile:
+        profiling.enable()
     app = SlurmDashboardApp()
     app.run()
 
@@ -1,32 +1,50 @@
 #!/usr/bin/env python
-from typing import Optional, List
-from pathlib import Path
-import random
-import shutil
-import subprocess
+"""
+snapshot runs on the critical path of every job launch, so at startup this module
+only imports what it needs to copy and run. typer and rich are imported only when
+the arguments need the full CLI, e.g., for --help or to report a usage error.
+"""
 import os
-import typer
-from rich.console import Console
+import shutil
+import sys
+import time
+
+from slurm_tools import profiling
+from slurm_tools.argv import parse_argv_for, typer_command
+
+
+def default_base_dir():
+    return os.environ.get("SNAPSHOT_DIR", "snapshotted_experiments")
+
+
+def default_exclude():
+    if "SNAPSHOT_EXCLUDE" in os.environ:
+        return os.environ["SNAPSHOT_EXCLUDE"].split(",")
+    else:
+        return None
+
+
+class PlainConsole:
+    """
+    Stands in for rich's Console.log on the fast path
+    """
 
-SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshotted_experiments")
-if 'SNAPSHOT_EXCLUDE' in os.environ:
-    EXCLUDE = os.environ.split(',')
-else:
-    EXCLUDE = None
+    def log(self, *objects):
+        print(time.strftime("[%X]"), *objects, flush=True)
 
-console = Console()
-cli = typer.Typer()
+
+console = PlainConsole()
 
 
-@cli.command()
 def main(
     command: str,
-    exclude: List[str] = None,
-    base_dir: str = SNAPSHOT_DIR,
-    experiment_id: Optional[str] = None,
+    exclude: "List[str]" = None,
+    base_dir: str = None,
+    experiment_id: str = None,
     dry_run: bool = False,
-    min_experiment_id=200_000,
-    max_experiment_id=300_000
+    min_experiment_id: int = 200_000,
+    max_experiment_id: int = 300_000,
+    profile: bool = False,
 ):
     """
     This tool helps isolate experiments on NFS by:
@@ -36,34 +54,81 @@ def main(
 
     For example, you can run:
     $ snapshot --experiment-id 42 'echo "my awesome experiment"'
+
+    The base directory defaults to $SNAPSHOT_DIR or snapshotted_experiments, and
+    the exclude patterns to the comma separated $SNAPSHOT_EXCLUDE.
     """
-    if exclude is None and EXCLUDE is not None:
-        exclude = exclude
+    if profile:
+        profiling.enable()
+    # typer passes an empty list when --exclude is not given
+    if not exclude:
+        exclude = default_exclude()
+    if base_dir is None:
+        base_dir = default_base_dir()
 
     if dry_run:
         console.log("Running in dry run mode, no changes will be made")
     current_dir = os.getcwd()
     if experiment_id is None:
+        import random
+
         experiment_id = random.randint(min_experiment_id, max_experiment_id)
-    experiment_dir = Path(base_dir) / f"experiment_{experiment_id}"
-    if experiment_dir.exists():
+    experiment_dir = os.path.join(base_dir, f"experiment_{experiment_id}")
+    if os.path.exists(experiment_dir):
         console.log("Experiment code dir exists, deleting before copying")
-        shutil.rmtree(experiment_dir)
+        with profiling.span("delete", experiment_dir):
+            shutil.rmtree(experiment_dir)
     console.log(f"Excluding: {exclude} for Copying: {current_dir} to {experiment_dir}")
     if not dry_run:
-        if exclude is None:
-            shutil.copytree(
-                current_dir, experiment_dir,
-            )
-        else:
-            shutil.copytree(
-                current_dir, experiment_dir, ignore=shutil.ignore_patterns(*exclude)
-            )
+        # profiling.copy2 stats every copied file for its size, so only use it when profiling
+        copy_function = profiling.copy2 if profiling.is_enabled() else shutil.copy2
+        with profiling.span("copytree", current_dir):
+            if exclude is None:
+                shutil.copytree(
+                    current_dir, experiment_dir, copy_function=copy_function,
+                )
+            else:
+                shutil.copytree(
+                    current_dir,
+                    experiment_dir,
+                    ignore=shutil.ignore_patterns(*exclude),
+                    copy_function=copy_function,
+                )
         os.chdir(experiment_dir)
     console.log(f"Running: {command} from {os.getcwd()}")
     if not dry_run:
-        subprocess.run(command, shell=True, check=True)
+        profiling.run(command, shell=True, check=True)
+
+
+def typer_cli():
+    """
+    Builds the typer CLI, which gives help and error messages plus rich output
+    """
+    from typing import List
+
+    import typer
+    from rich.console import Console
+
+    global console
+    console = Console()
+    app = typer.Typer()
+    app.command()(
+        typer_command(
+            main,
+            annotations={"exclude": List[str]},
+            defaults={"base_dir": default_base_dir()},
+        )
+    )
+    return app
+
+
+def cli():
+    args = parse_argv_for(main, sys.argv[1:])
+    if args is None:
+        typer_cli()()
+    else:
+        main(**args)
 
 
 if __name__ == "__main__":
-    cli()
\ No newline at end of file
+    cli()
@@ -0,0 +1,104 @@
+"""
+snapshot and slogs parse common invocations with slurm_tools.argv and fall back to
+typer otherwise, so the fast path must agree with the typer command on every argv
+it accepts, and only decline argv that typer rejects or that asks for help.
+"""
+import inspect
+
+import click
+import pytest
+import typer.main
+
+from slurm_tools import slurm_logs, snapshot
+from slurm_tools.argv import parse_argv_for
+
+SNAPSHOT_CASES = [
+    ["echo hi"],
+    ["--exclude", "a", "--exclude=b", "echo hi"],
+    ["--dry-run", "--base-dir", "/tmp/snapshots", "--experiment-id", "42", "echo hi"],
+    ["--base-dir=/tmp/snapshots", "--min-experiment-id", "1", "--max-experiment-id=2", "echo hi"],
+    ["echo hi", "--profile"],
+    ["--no-dry-run", "--no-profile", "echo hi"],
+    ["--", "--looks-like-an-option"],
+    ["--dry-run", "--", "-"],
+    # Invalid or help, which fall back to typer
+    ["echo hi", "--base-dir"],
+    ["--min-experiment-id", "not-an-int", "echo hi"],
+    ["echo hi", "extra"],
+    [],
+    ["--unknown", "echo hi"],
+    ["--dry-run=true", "echo hi"],
+    ["-h"],
+    ["--help"],
+]
+
+SLOGS_CASES = [
+    ["logs"],
+    ["--no-latest", "--tail-stdout", "logs"],
+    ["logs", "--tail-stderr", "--profile"],
+    ["--latest", "--no-tail-stdout", "--", "-logs"],
+    # Invalid or help, which fall back to typer
+    [],
+    ["logs", "other"],
+    ["--latest=false", "logs"],
+    ["-h"],
+    ["--help"],
+]
+
+
+def resolve_snapshot(params: dict):
+    # main treats an empty exclude and a missing base_dir as unset
+    params = dict(params)
+    params["exclude"] = list(params["exclude"]) if params["exclude"] else None
+    if params["base_dir"] is None:
+        params["base_dir"] = snapshot.default_base_dir()
+    return params
+
+
+def resolve_slogs(params: dict):
+    return params
+
+
+def call_params(func, fast_args: dict):
+    """
+    The parameters func is called with on the fast path, including defaults
+    """
+    params = {
+        name: p.default
+        for name, p in inspect.signature(func).parameters.items()
+        if p.default is not inspect.Parameter.empty
+    }
+    params.update(fast_args)
+    return params
+
+
+@pytest.mark.parametrize(
+    "module,resolve,argv",
+    [(snapshot, resolve_snapshot, argv) for argv in SNAPSHOT_CASES]
+    + [(slurm_logs, resolve_slogs, argv) for argv in SLOGS_CASES],
+)
+def test_fast_path_agrees_with_typer(monkeypatch, module, resolve, argv):
+    monkeypatch.delenv("SNAPSHOT_DIR", raising=False)
+    monkeypatch.delenv("SNAPSHOT_EXCLUDE", raising=False)
+    fast_args = parse_argv_for(module.main, list(argv))
+    command = typer.main.get_command(module.typer_cli())
+    try:
+        typer_params = command.make_context(module.__name__, list(argv)).params
+    except (click.UsageError, click.exceptions.Exit):
+        typer_params = None
+
+    if fast_args is None:
+        assert typer_params is None, f"fast path declined argv that typer accepts: {argv}"
+    else:
+        assert typer_params is not None, f"fast path accepted argv that typer rejects: {argv}"
+        assert resolve(call_params(module.main, fast_args)) == resolve(typer_params)
+
+
+def test_typer_cli_leaves_main_unchanged():
+    annotations = dict(snapshot.main.__annotations__)
+    snapshot.typer_cli()
+    assert snapshot.main.__annotations__ == annotations
+    assert parse_argv_for(snapshot.main, ["--exclude", "a", "c"]) == {
+        "exclude": ["a"],
+        "command": "c",
+    }
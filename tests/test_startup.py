@@ -0,0 +1,70 @@
+"""
+snapshot and slogs run on the critical path of job launches, so their common
+invocations must not import typer, rich or the other heavy dependencies.
+"""
+from pathlib import Path
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["typer", "click", "rich", "textual", "pandas", "streamlit", "pydantic"]
+
+
+def imported_modules(importtime_output: str):
+    modules = set()
+    for line in importtime_output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def run_with_importtime(module: str, args, cwd: Path, env: dict):
+    # Mirrors the installed console script rather than `python -m`
+    code = f"import sys; from {module} import cli; sys.exit(cli())"
+    env = dict(env, PYTHONPATH=f"{REPO_ROOT}{os.pathsep}{env.get('PYTHONPATH', '')}")
+    env.pop("SLURM_TOOLS_PROFILE", None)
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        cwd=cwd,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    ).stderr
+
+
+def snapshot_invocation(tmp_path: Path):
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    (source_dir / "train.py").write_text("print('training')\n")
+    args = ["--base-dir", str(tmp_path / "snapshots"), "--experiment-id", "1", "true"]
+    return "slurm_tools.snapshot", args, source_dir, dict(os.environ)
+
+
+def slogs_invocation(tmp_path: Path):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    (log_dir / "42_submission.sh").write_text("#!/bin/bash\n")
+    (log_dir / "42_0_log.out").write_text("Job completed successfully\n")
+    (log_dir / "42_0_log.err").write_text("")
+    # slogs finishes with `squeue --job`, so put a fake squeue first on PATH
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    squeue = bin_dir / "squeue"
+    squeue.write_text("#!/bin/sh\necho JOBID\n")
+    squeue.chmod(0o755)
+    env = dict(os.environ, PATH=f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    return "slurm_tools.slurm_logs", [str(log_dir)], tmp_path, env
+
+
+@pytest.mark.parametrize("invocation", [snapshot_invocation, slogs_invocation])
+def test_fast_path_skips_heavy_modules(tmp_path, invocation):
+    module, args, cwd, env = invocation(tmp_path)
+    modules = imported_modules(run_with_importtime(module, args, cwd, env))
+    assert module in modules
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+    assert heavy == []